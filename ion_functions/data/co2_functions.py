@@ -11,6 +11,48 @@ import numexpr as ne
 from ion_functions.utils import fill_value
 
 
+def _atleast_1d(x):
+    """
+    Equivalent to np.atleast_1d, but returns inputs that are already arrays
+    of at least one dimension without the extra call overhead.
+    """
+    if isinstance(x, np.ndarray) and x.ndim >= 1:
+        return x
+    return np.atleast_1d(x)
+
+
+def _atleast_2d(x):
+    """
+    Equivalent to np.atleast_2d, but returns inputs that are already arrays
+    of at least two dimensions without the extra call overhead.
+    """
+    if isinstance(x, np.ndarray) and x.ndim >= 2:
+        return x
+    return np.atleast_2d(x)
+
+
+def _scratch(buf, *args):
+    """
+    Return buf if it can hold the result of an element-wise operation on args
+    (a float64 array of the broadcast shape), so the result can be written
+    back into it. Otherwise return None, so a new array is allocated.
+    """
+    if buf.dtype == np.float64 and np.broadcast(*args).shape == buf.shape:
+        return buf
+    return None
+
+
+def _light_column(light, column):
+    """
+    Return a contiguous copy of one column of the PCO2W light measurements,
+    for either a single record (1D) or a set of records (2D).
+    """
+    light = np.asanyarray(light)
+    if light.ndim == 0 or light.shape[-1] <= column:
+        raise ValueError('light measurements must contain at least %d columns' % (column + 1))
+    return np.ascontiguousarray(light[..., column])
+
+
 # wrapper functions to extract parameters from SAMI-II CO2 instruments (PCO2W)
 # and process these extracted parameters to calculate pCO2
 def pco2_abs434_ratio(light):
@@ -25,6 +67,8 @@ def pco2_abs434_ratio(light):
 
         2013-04-20: Christopher Wingard. Initial code.
         2014-02-19: Christopher Wingard. Updated comments.
+        2026-10-15: agent. Returns a contiguous copy of the ratio, and accepts
+                    a single record of light measurements as a 1D array.
 
     Usage:
 
@@ -43,8 +87,7 @@ def pco2_abs434_ratio(light):
             OOI >> Controlled >> 1000 System Level >>
             1341-00490_Data_Product_SPEC_PCO2WAT_OOI.pdf)
     """
-    light = np.atleast_2d(light)
-    a434ratio = light[:, 6]
+    a434ratio = _light_column(light, 6)
     return a434ratio
 
 
@@ -60,6 +103,8 @@ def pco2_abs620_ratio(light):
 
         2013-04-20: Christopher Wingard. Initial code.
         2014-02-19: Christopher Wingard. Updated comments.
+        2026-10-15: agent. Returns a contiguous copy of the ratio, and accepts
+                    a single record of light measurements as a 1D array.
 
     Usage:
 
@@ -78,8 +123,7 @@ def pco2_abs620_ratio(light):
             OOI >> Controlled >> 1000 System Level >>
             1341-00490_Data_Product_SPEC_PCO2WAT_OOI.pdf)
     """
-    light = np.atleast_2d(light)
-    a620ratio = light[:, 7]
+    a620ratio = _light_column(light, 7)
     return a620ratio
 
 
@@ -120,7 +164,7 @@ def pco2_blank(raw_blank):
     return blank
 
 
-def pco2_thermistor(traw):
+def pco2_thermistor(traw, sami_bits=12):
     """
     Description:
 
@@ -131,15 +175,20 @@ def pco2_thermistor(traw):
 
         2013-04-20: Christopher Wingard. Initial code.
         2014-02-19: Christopher Wingard. Updated comments.
+        2026-10-15: agent. Added support for 14-bit SAMI thermistor counts,
+                    selected per sample from sami_bits.
 
     Usage:
 
-        therm = pco2_thermistor(traw)
+        therm = pco2_thermistor(traw, sami_bits)
 
             where
 
         therm = converted thermistor temperature [degC]
         traw = raw thermistor temperature (CO2THRM_L0) [counts]
+        sami_bits = resolution of the SAMI A/D converter, either 12 (default)
+            or 14 [bits]. May be a scalar or an array with one value per
+            sample, so records from both instrument types can be mixed.
 
     References:
 
@@ -149,10 +198,15 @@ def pco2_thermistor(traw):
             OOI >> Controlled >> 1000 System Level >>
             1341-00490_Data_Product_SPEC_PCO2WAT_OOI.pdf)
     """
-    # convert raw thermistor readings from counts to degrees Centigrade
-    Rt = ne.evaluate('log((traw / (4096. - traw)) * 17400.)')
-    InvT = ne.evaluate('0.0010183 + 0.000241 * Rt + 0.00000015 * Rt**3')
-    therm = ne.evaluate('(1 / InvT) - 273.15')
+    # full scale counts for the 12 or 14 bit A/D converter
+    full_scale = np.where(np.asarray(sami_bits) == 14, 16384., 4096.)
+
+    # convert raw thermistor readings from counts to degrees Centigrade, using
+    # the Steinhart-Hart equation evaluated in a single pass over Rt, and
+    # written back into the Rt array
+    Rt = ne.evaluate('log((traw / (full_scale - traw)) * 17400.)')
+    therm = ne.evaluate('1 / (0.0010183 + 0.000241 * Rt + 0.00000015 * Rt * Rt * Rt) - 273.15',
+                        out=Rt)
     return therm
 
 
@@ -163,7 +217,8 @@ def pco2_pco2wat(mtype, light, therm, ea434, eb434, ea620, eb620,
 
         Function to calculate the L1 PCO2WAT core data from the pCO2 instrument
         if the measurement type is 4 (pCO2 measurement), otherwise it is a
-        blank and return a fill value.
+        blank and return a fill value. Blanks are identified only from the
+        measurement type (mtype == 5).
 
     Implemented by:
 
@@ -173,6 +228,10 @@ def pco2_pco2wat(mtype, light, therm, ea434, eb434, ea620, eb620,
                     Chris Fortin.
         2017-04-04: Pete Cable. Updated algorithm to use thermistor/blank counts
                     as indicated in the DPS and the usage below.
+        2026-10-15: agent. Optimized, calculating pCO2 from the 434 and 620 nm
+                    ratios with pco2_calc_pco2_ratios. Blanks are now set from
+                    mtype == 5 only, so a measurement (mtype == 4) with equal
+                    blank corrected ratios returns NaN rather than a fill value.
 
     Usage:
 
@@ -207,30 +266,30 @@ def pco2_pco2wat(mtype, light, therm, ea434, eb434, ea620, eb620,
     """
     # reset inputs to arrays
     # measurements
-    mtype = np.atleast_1d(mtype)
-    light = np.atleast_2d(light)
-    therm = np.atleast_1d(therm)
+    mtype = _atleast_1d(mtype)
+    light = _atleast_2d(light)
+    therm = _atleast_1d(therm)
     # calibration coefficients
-    ea434 = np.atleast_1d(ea434)
-    eb434 = np.atleast_1d(eb434)
-    ea620 = np.atleast_1d(ea620)
-    eb620 = np.atleast_1d(eb620)
-    calt = np.atleast_1d(calt)
-    cala = np.atleast_1d(cala)
-    calb = np.atleast_1d(calb)
-    calc = np.atleast_1d(calc)
+    ea434 = _atleast_1d(ea434)
+    eb434 = _atleast_1d(eb434)
+    ea620 = _atleast_1d(ea620)
+    eb620 = _atleast_1d(eb620)
+    calt = _atleast_1d(calt)
+    cala = _atleast_1d(cala)
+    calb = _atleast_1d(calb)
+    calc = _atleast_1d(calc)
     # blank measurements
-    a434blank = np.atleast_1d(a434blank)
-    a620blank = np.atleast_1d(a620blank)
-
-    # calculate the pco2 value
-    pco2 = pco2_calc_pco2(light, therm, ea434, eb434, ea620, eb620,
-                          calt, cala, calb, calc, a434blank, a620blank)
-
-    # reset dark measurements to the fill value
-    m = np.where(mtype == 5)[0]
-    pco2[m] = fill_value
-
+    a434blank = _atleast_1d(a434blank)
+    a620blank = _atleast_1d(a620blank)
+
+    # calculate the pco2 value from contiguous copies of the 434 and 620 nm
+    # ratios, rather than strided views into the light array
+    ratio434 = pco2_abs434_ratio(light)
+    ratio620 = pco2_abs620_ratio(light)
+    # blank measurements (mtype == 5) are reset to the fill value as part of
+    # the calculation
+    pco2 = pco2_calc_pco2_ratios(ratio434, ratio620, therm, ea434, eb434, ea620, eb620,
+                                 calt, cala, calb, calc, a434blank, a620blank, mtype)
     return pco2
 
 
@@ -255,6 +314,9 @@ def pco2_calc_pco2(light, therm, ea434, eb434, ea620, eb620,
                     incorrectly calculated the blank correction. Applies additional
                     corrections to calculations to avoid errors thrown when running a
                     blank measurement.
+        2026-10-15: agent. Optimized, now a wrapper around pco2_calc_pco2_ratios
+                    which evaluates the calculation with numexpr. Accepts a
+                    single record of light measurements as a 1D array.
 
     Usage:
 
@@ -277,6 +339,63 @@ def pco2_calc_pco2(light, therm, ea434, eb434, ea620, eb620,
         a434blank = Blank measurements at 434 nm (CO2ABS1_L0) [counts]
         a620blank = Blank measurements to 620 nm (CO2ABS2_L0) [counts]
 
+    References:
+
+        OOI (2012). Data Product Specification for Partial Pressure of CO2 in
+            Seawater. Document Control Number 1341-00510.
+            https://alfresco.oceanobservatories.org/ (See: Company Home >>
+            OOI >> Controlled >> 1000 System Level >>
+            1341-00490_Data_Product_SPEC_PCO2WAT_OOI.pdf)
+    """
+    ratio434 = pco2_abs434_ratio(light)
+    ratio620 = pco2_abs620_ratio(light)
+    pco2 = pco2_calc_pco2_ratios(ratio434, ratio620, therm, ea434, eb434, ea620, eb620,
+                                 calt, cala, calb, calc, a434blank, a620blank)
+    return pco2
+
+
+def pco2_calc_pco2_ratios(ratio434, ratio620, therm, ea434, eb434, ea620, eb620,
+                          calt, cala, calb, calc, a434blank, a620blank, mtype=None):
+    """
+    Description:
+
+        Calculates the OOI Level 1 Partial Pressure of CO2 (pCO2) in seawater
+        core data product from the 434 and 620 nm absorbance ratios, rather
+        than from the full light measurement array (see pco2_calc_pco2).
+        Passing the two ratios as separate, contiguous arrays avoids strided
+        access into the light array.
+
+    Implemented by:
+
+        2026-10-15: agent. Initial code, split from pco2_calc_pco2.
+
+    Usage:
+
+        pco2 = pco2_calc_pco2_ratios(ratio434, ratio620, therm, ea434, eb434,
+                                     ea620, eb620, calt, cala, calb, calc,
+                                     a434blank, a620blank, mtype)
+
+            where
+
+        pco2 = measured pco2 in seawater (PCO2WAT_L1) [uatm]
+        ratio434 = optical absorbance ratio at 434 nm (CO2ABS1_L0) [unitless]
+        ratio620 = optical absorbance ratio at 620 nm (CO2ABS2_L0) [unitless]
+        therm = PCO2W thermistor temperature (CO2THRM_L0) [counts]
+        ea434 = Reagent specific calibration coefficient
+        eb434 = Reagent specific calibration coefficient
+        ea620 = Reagent specific calibration coefficient
+        eb620 = Reagent specific calibration coefficient
+        calt = Instrument specific calibration coefficient for temperature
+        cala = Instrument specific calibration coefficient for the pCO2 measurements
+        calb = Instrument specific calibration coefficient for the pCO2 measurements
+        calc = Instrument specific calibration coefficient for the pCO2 measurements
+        a434blank = Blank measurements at 434 nm (CO2ABS1_L0) [counts]
+        a620blank = Blank measurements to 620 nm (CO2ABS2_L0) [counts]
+        mtype = optional measurement type, where 4 == actual measurement and
+            5 == a blank measurement [unitless]. If not provided, blanks are
+            identified as the records where the blank corrected 434 and 620 nm
+            ratios are equal.
+
     References:
 
         OOI (2012). Data Product Specification for Partial Pressure of CO2 in
@@ -297,38 +416,61 @@ def pco2_calc_pco2(light, therm, ea434, eb434, ea620, eb620,
     e2 = 2.136
     e3 = 0.2105
 
-    # Extract variables from light array
-    Ratio434 = light[:, 6]     # 434nm Ratio
-    Ratio620 = light[:, 7]     # 620nm Ratio
-
     # Convert thermistor counts to degrees C
     therm = pco2_thermistor(therm)
 
-    # correct the absorbance ratios using the blanks
-    AR434 = (Ratio434 / a434blank)
-    AR620 = (Ratio620 / a620blank)
+    # correct the absorbance ratios using the blanks. The light and blank
+    # measurements are both raw counts and may be integers, so the blanks are
+    # made floating point to avoid an integer division.
+    a434blank = np.asarray(a434blank, dtype=np.float64)
+    a620blank = np.asarray(a620blank, dtype=np.float64)
+    AR434 = ne.evaluate('ratio434 / a434blank')
+    AR620 = ne.evaluate('ratio620 / a620blank')
 
     # map out blank measurements and spoof the ratios to avoid throwing an error
-    m = np.where(AR434 == AR620)[0]
-    AR434[m] = 0.99999
-    AR620[m] = 0.99999
-
-    # Calculate the final absorbance ratio
-    A434 = -1 * np.log10(AR434)  # 434 absorbance
-    A620 = -1 * np.log10(AR620)  # 620 absorbance
-    Ratio = A620 / A434          # Absorbance ratio
-
-    # calculate pCO2
-    V1 = Ratio - e1
-    V2 = e2 - e3 * Ratio
-    RCO21 = -1 * np.log10(V1 / V2)
-    RCO22 = (therm - calt) * 0.008 + RCO21
-    Tcoeff = 0.0075778 - 0.0012389 * RCO22 - 0.00048757 * RCO22**2
-    Tcor_RCO2 = RCO21 + Tcoeff * (therm - calt)
-    pco2 = 10.**((-1. * calb + (calb**2 - (4. * cala * (calc - Tcor_RCO2)))**0.5) / (2. * cala))
-    pco2[m] = fill_value  # reset the blanks captured earlier to a fill value
+    if mtype is None:
+        m = AR434 == AR620
+    else:
+        m = np.asarray(mtype) == 5
+    if not AR434.shape == AR620.shape == m.shape:
+        # broadcast the ratios and the blank flags together, as a scalar
+        # mtype may apply to all of the records, and make writable copies of
+        # any broadcast ratios
+        AR434, AR620, m = [np.array(a) for a in np.broadcast_arrays(AR434, AR620, m)]
+    np.putmask(AR434, m, 0.99999)
+    np.putmask(AR620, m, 0.99999)
+
+    # Calculate the final absorbance ratio (the -1 scaling on the 434 and 620
+    # absorbances, and the base of the logarithm, cancel out in the ratio).
+    # From here on, intermediate results are written back into buffers that
+    # are no longer needed, where the shapes allow, instead of allocating a
+    # new array at each step.
+    Ratio = ne.evaluate('log(AR620) / log(AR434)', out=_scratch(AR434, AR434, AR620))
+
+    # calculate pCO2, fusing the temperature correction and the quadratic
+    # solution into single passes over the data. log10(x) and 10**x are
+    # evaluated as log(x) / ln(10) and exp(ln(10) * x).
+    RCO21 = ne.evaluate('-0.4342944819032518 * log((Ratio - e1) / (e2 - e3 * Ratio))',
+                        out=Ratio)
+    RCO22 = ne.evaluate('(therm - calt) * 0.008 + RCO21',
+                        out=_scratch(AR620, therm, calt, RCO21))
+
+    # solve the quadratic for pCO2. The discriminant is real for valid data,
+    # so sqrt is used directly rather than a fractional power; an invalid
+    # (negative) discriminant yields NaN, as before. The terms that depend only
+    # on the calibration coefficients (usually one value per deployment) are
+    # computed up front rather than for every element.
+    calb2 = calb * calb
+    cala4 = 4. * cala
+    scale = 2.302585092994046 / (2. * cala)
+    pco2 = ne.evaluate('exp(scale * (sqrt(calb2 - cala4 * (calc - (RCO21 + (0.0075778 - '
+                       '0.0012389 * RCO22 - 0.00048757 * RCO22 * RCO22) * (therm - calt)))) '
+                       '- calb))',
+                       out=_scratch(RCO22, calb, cala, calc, RCO21, RCO22, therm, calt))
+    # reset the blanks captured earlier to a fill value
+    np.putmask(pco2, np.broadcast_to(m, pco2.shape), fill_value)
 
-    return np.real(pco2)
+    return pco2
 
 
 def pco2_ppressure(xco2, p, std=1013.25):
@@ -384,6 +526,8 @@ def pco2_co2flux(pco2w, pco2a, u10, t, s):
 
         2012-03-28: Mathias Lankhorst. Original Matlab code.
         2013-04-20: Christopher Wingard. Initial python code.
+        2026-10-15: agent. Optimized, evaluating the flux as a single numexpr
+                    expression.
 
     Usage:
 
@@ -407,34 +551,30 @@ def pco2_co2flux(pco2w, pco2a, u10, t, s):
             OOI >> Controlled >> 1000 System Level >>
             1341-00270_Data_Product_SPEC_CO2FLUX_OOI.pdf)
     """
-    # convert micro-atm to atm
-    pco2a = pco2a / 1.0e6
-    pco2w = pco2w / 1.0e6
-
-    # Compute Schmidt number (after Wanninkhof, 1992, Table A1)
-    Sc = 2073.1 - (125.62 * t) + (3.6276 * t**2) - (0.043219 * t**3)
-
-    # Compute gas transfer velocity (after Sweeney et al. 2007, Fig. 3 and Table 1)
-    k = 0.27 * u10**2 * np.sqrt(660.0 / Sc)
+    # Compute the absolute temperature, scaled by 1/100 for the solubility
+    T100 = ne.evaluate('(t + 273.15) / 100')
 
-    # convert cm h-1 to m s-1
-    k = k / (100.0 * 3600.0)
+    # The flux is evaluated as a single fused expression, built up from:
+    #
+    # Schmidt number (after Wanninkhof, 1992, Table A1)
+    Sc = '(2073.1 - (125.62 * t) + (3.6276 * t * t) - (0.043219 * t * t * t))'
 
-    # Compute the absolute temperature
-    T = t + 273.15
+    # gas transfer velocity (after Sweeney et al. 2007, Fig. 3 and Table 1),
+    # converted from cm h-1 to m s-1
+    k = '(0.27 * u10 * u10 * sqrt(660.0 / %s) / (100.0 * 3600.0))' % Sc
 
-    # Compute solubility (after Weiss 1974, Eqn. 12 and Table I).
-    # Note that there are two versions, one for units per volume and
-    # one per mass. Here, the volume version is used.
+    # solubility (after Weiss 1974, Eqn. 12 and Table I). Note that there are
+    # two versions, one for units per volume and one per mass. Here, the volume
+    # version is used.
     # mol atm-1 m-3
-    T100 = T / 100
-    K0 = 1000 * np.exp(-58.0931 + (90.5069 * (100/T)) + (22.2940 * np.log(T100)) +
-                       s * (0.027766 - (0.025888 * T100) + (0.0050578 * T100**2)))
+    K0 = ('(1000 * exp(-58.0931 + (90.5069 / T100) + (22.2940 * log(T100)) + '
+          's * (0.027766 - (0.025888 * T100) + (0.0050578 * T100 * T100))))')
 
     # mol atm-1 kg-1
-    #K0 = np.exp(-60.2409 + (93.4517 * (100/T)) + (23.3585 * np.log(T100)) +
-    #            s * (0.023517 - (0.023656 * T100) + (0.0047036 * T100**2)))
+    #K0 = ('(exp(-60.2409 + (93.4517 / T100) + (23.3585 * log(T100)) + '
+    #      's * (0.023517 - (0.023656 * T100) + (0.0047036 * T100 * T100))))')
 
-    # Compute flux (after Wanninkhof, 1992, eqn. A2)
-    flux = k * K0 * (pco2w - pco2a)
+    # and the flux (after Wanninkhof, 1992, eqn. A2), with the partial
+    # pressures converted from micro-atm to atm
+    flux = ne.evaluate('%s * %s * ((pco2w - pco2a) / 1.0e6)' % (k, K0))
     return flux
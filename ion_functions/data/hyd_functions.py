@@ -45,19 +45,17 @@ def hyd_bb_acoustic_pwaves(wav, gain):
     wav = np.atleast_2d(wav)
     nRec = wav.shape[0]
 
-    if np.isscalar(gain) is True:
-        gain = np.tile(gain, (nRec, 1))
+    # Convert the gain from dB to a linear value and fold it, together with the
+    # wav format scaling (3 V full scale), into a single multiplier
+    if np.isscalar(gain):
+        scale = 3. / 10**(gain / 20.)
     else:
         gain = np.reshape(gain, (nRec, 1))
+        scale = ne.evaluate("3. / 10**(gain/20.)")
 
-    # Convert the gain from dB to a linear value
-    gain = ne.evaluate("10**(gain/20.)")
-
-    # convert the broadband acoustic pressure wave data to Volts
-    volts = ne.evaluate("wav * 3.")
-
-    # and correct for the gain
-    tsv = ne.evaluate("volts / gain")
+    # convert the broadband acoustic pressure wave data to Volts, correcting
+    # for the gain
+    tsv = ne.evaluate("wav * scale")
     return tsv
 
 
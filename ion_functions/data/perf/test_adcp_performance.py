@@ -57,124 +57,85 @@ class TestADCPPerformance(PerformanceTestCase):
         self.ww = np.array([0.1401,  0.3977,  0.1870,  0.1637,  0.0091,
                             -0.1290,  0.0334, -0.3017, 0.1384, 0.1966])
 
+        # replicate the inputs out to 10000 records once, rather than in each
+        # of the tests
+        self.b1_tiled = np.tile(self.b1, (10000, 1))
+        self.b2_tiled = np.tile(self.b2, (10000, 1))
+        self.b3_tiled = np.tile(self.b3, (10000, 1))
+        self.b4_tiled = np.tile(self.b4, (10000, 1))
+
+        self.pg1_tiled = np.tile(self.pg1, (10000, 1))
+        self.pg2_tiled = np.tile(self.pg2, (10000, 1))
+        self.pg3_tiled = np.tile(self.pg3, (10000, 1))
+        self.pg4_tiled = np.tile(self.pg4, (10000, 1))
+
+        self.echo_tiled = np.tile(self.echo, (10000, 1))
+        self.uu_tiled = np.tile(self.uu, (10000, 1))
+        self.vv_tiled = np.tile(self.vv, (10000, 1))
+        self.ww_tiled = np.tile(self.ww, (10000, 1))
+
+        self.sfactor_rep = np.repeat(self.sfactor, 10000)
+        self.h_rep = np.repeat(self.heading, 10000)
+        self.p_rep = np.repeat(self.pitch, 10000)
+        self.r_rep = np.repeat(self.roll, 10000)
+        self.vf_rep = np.repeat(self.orient, 10000)
+        self.lat_rep = np.repeat(self.lat, 10000)
+        self.lon_rep = np.repeat(self.lon, 10000)
+        self.z_rep = np.repeat(self.depth, 10000)
+        self.dt_rep = np.repeat(self.ntp, 10000)
+
     def test_adcp_backscatter(self):
         stats = []
 
-        echo = np.tile(self.echo, (10000, 1))
-        sfactor = np.repeat(self.sfactor, 10000)
-        self.profile(stats, af.adcp_backscatter, echo, sfactor)
+        self.profile(stats, af.adcp_backscatter, self.echo_tiled, self.sfactor_rep)
 
     def test_adcp_beam_eastward(self):
         stats = []
 
-        b1 = np.tile(self.b1, (10000, 1))
-        b2 = np.tile(self.b2, (10000, 1))
-        b3 = np.tile(self.b3, (10000, 1))
-        b4 = np.tile(self.b4, (10000, 1))
-
-        pg1 = np.tile(self.pg1, (10000, 1))
-        pg2 = np.tile(self.pg2, (10000, 1))
-        pg3 = np.tile(self.pg3, (10000, 1))
-        pg4 = np.tile(self.pg4, (10000, 1))
-
-        h = np.repeat(self.heading, 10000)
-        p = np.repeat(self.pitch, 10000)
-        r = np.repeat(self.roll, 10000)
-        vf = np.repeat(self.orient, 10000)
-        lat = np.repeat(self.lat, 10000)
-        lon = np.repeat(self.lon, 10000)
-        dt = np.repeat(self.ntp, 10000)
-
-        self.profile(stats, af.adcp_beam_eastward, b1, b2, b3, b4, pg1, pg2, pg3, pg4, h, p, r, vf, lat, lon, dt)
+        self.profile(stats, af.adcp_beam_eastward,
+                     self.b1_tiled, self.b2_tiled, self.b3_tiled, self.b4_tiled,
+                     self.pg1_tiled, self.pg2_tiled, self.pg3_tiled, self.pg4_tiled,
+                     self.h_rep, self.p_rep, self.r_rep, self.vf_rep,
+                     self.lat_rep, self.lon_rep, self.dt_rep)
 
     def test_adcp_beam_northward(self):
         stats = []
 
-        b1 = np.tile(self.b1, (10000, 1))
-        b2 = np.tile(self.b2, (10000, 1))
-        b3 = np.tile(self.b3, (10000, 1))
-        b4 = np.tile(self.b4, (10000, 1))
-
-        pg1 = np.tile(self.pg1, (10000, 1))
-        pg2 = np.tile(self.pg2, (10000, 1))
-        pg3 = np.tile(self.pg3, (10000, 1))
-        pg4 = np.tile(self.pg4, (10000, 1))
-
-        h = np.repeat(self.heading, 10000)
-        p = np.repeat(self.pitch, 10000)
-        r = np.repeat(self.roll, 10000)
-        vf = np.repeat(self.orient, 10000)
-        lat = np.repeat(self.lat, 10000)
-        lon = np.repeat(self.lon, 10000)
-        dt = np.repeat(self.ntp, 10000)
-
-        self.profile(stats, af.adcp_beam_northward, b1, b2, b3, b4, pg1, pg2, pg3, pg4, h, p, r, vf, lat, lon, dt)
+        self.profile(stats, af.adcp_beam_northward,
+                     self.b1_tiled, self.b2_tiled, self.b3_tiled, self.b4_tiled,
+                     self.pg1_tiled, self.pg2_tiled, self.pg3_tiled, self.pg4_tiled,
+                     self.h_rep, self.p_rep, self.r_rep, self.vf_rep,
+                     self.lat_rep, self.lon_rep, self.dt_rep)
 
     def test_adcp_beam_vertical(self):
         stats = []
 
-        b1 = np.tile(self.b1, (10000, 1))
-        b2 = np.tile(self.b2, (10000, 1))
-        b3 = np.tile(self.b3, (10000, 1))
-        b4 = np.tile(self.b4, (10000, 1))
-
-        pg1 = np.tile(self.pg1, (10000, 1))
-        pg2 = np.tile(self.pg2, (10000, 1))
-        pg3 = np.tile(self.pg3, (10000, 1))
-        pg4 = np.tile(self.pg4, (10000, 1))
-
-        h = np.repeat(self.heading, 10000)
-        p = np.repeat(self.pitch, 10000)
-        r = np.repeat(self.roll, 10000)
-        vf = np.repeat(self.orient, 10000)
-
-        self.profile(stats, af.adcp_beam_vertical, b1, b2, b3, b4, pg1, pg2, pg3, pg4, h, p, r, vf)
+        self.profile(stats, af.adcp_beam_vertical,
+                     self.b1_tiled, self.b2_tiled, self.b3_tiled, self.b4_tiled,
+                     self.pg1_tiled, self.pg2_tiled, self.pg3_tiled, self.pg4_tiled,
+                     self.h_rep, self.p_rep, self.r_rep, self.vf_rep)
 
     def test_adcp_beam_error(self):
         stats = []
 
-        b1 = np.tile(self.b1, (10000, 1))
-        b2 = np.tile(self.b2, (10000, 1))
-        b3 = np.tile(self.b3, (10000, 1))
-        b4 = np.tile(self.b4, (10000, 1))
-
-        pg1 = np.tile(self.pg1, (10000, 1))
-        pg2 = np.tile(self.pg2, (10000, 1))
-        pg3 = np.tile(self.pg3, (10000, 1))
-        pg4 = np.tile(self.pg4, (10000, 1))
-
-        self.profile(stats, af.adcp_beam_error, b1, b2, b3, b4, pg1, pg2, pg3, pg4)
+        self.profile(stats, af.adcp_beam_error,
+                     self.b1_tiled, self.b2_tiled, self.b3_tiled, self.b4_tiled,
+                     self.pg1_tiled, self.pg2_tiled, self.pg3_tiled, self.pg4_tiled)
 
     def test_adcp_earth_eastward(self):
         stats = []
 
-        u = np.tile(self.uu, (10000, 1))
-        v = np.tile(self.vv, (10000, 1))
-
-        lat = np.repeat(self.lat, 10000)
-        lon = np.repeat(self.lon, 10000)
-        z = np.repeat(self.depth, 10000)
-        dt = np.repeat(self.ntp, 10000)
-
-        self.profile(stats, af.adcp_earth_eastward, u, v, z, lat, lon, dt)
+        self.profile(stats, af.adcp_earth_eastward, self.uu_tiled, self.vv_tiled,
+                     self.z_rep, self.lat_rep, self.lon_rep, self.dt_rep)
 
     def test_adcp_earth_northward(self):
         stats = []
 
-        u = np.tile(self.uu, (10000, 1))
-        v = np.tile(self.vv, (10000, 1))
-
-        lat = np.repeat(self.lat, 10000)
-        lon = np.repeat(self.lon, 10000)
-        z = np.repeat(self.depth, 10000)
-        dt = np.repeat(self.ntp, 10000)
-
-        self.profile(stats, af.adcp_earth_northward, u, v, z, lat, lon, dt)
+        self.profile(stats, af.adcp_earth_northward, self.uu_tiled, self.vv_tiled,
+                     self.z_rep, self.lat_rep, self.lon_rep, self.dt_rep)
 
     def test_adcp_earth_vertical(self):
         stats = []
 
-        w = np.tile(self.ww, (10000, 1))
-
-        self.profile(stats, af.adcp_earth_vertical, w)
+        self.profile(stats, af.adcp_earth_vertical, self.ww_tiled)
         # adcp_earth_error is the same transform, so this test applies to both
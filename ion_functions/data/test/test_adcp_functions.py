@@ -5,6 +5,8 @@
 @brief Unit tests for adcp_functions module
 """
 
+import os
+
 from nose.plugins.attrib import attr
 from ion_functions.test.base_test import BaseUnitTestCase
 
@@ -15,10 +17,26 @@ from ion_functions.data.adcp_functions import ADCP_FILLVALUE
 from ion_functions.data.generic_functions import SYSTEM_FILLVALUE
 
 
+# two records are enough to confirm arrays of arrays can be processed; set
+# ION_FULL_PERF=1 to run test_adcp_beam with the long form 24 record case
+NREC = 2
+NREC_FULL = 24 if os.environ.get('ION_FULL_PERF') == '1' else NREC
+
+
+def _rep(a, n=NREC):
+    """
+    Replicate a single record (row) n times as a read-only, zero-copy
+    broadcast view, for use in the multiple record test cases.
+    """
+    a = np.ascontiguousarray(a)
+    return np.broadcast_to(a, (n,) + a.shape[1:])
+
+
 @attr('UNIT', group='func')
 class TestADCPFunctionsUnit(BaseUnitTestCase):
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """
         Implemented by:
             2014-02-06: Christopher Wingard. Initial Code.
@@ -31,46 +49,63 @@ class TestADCPFunctionsUnit(BaseUnitTestCase):
 
         """
         # set test inputs -- values from DPS (reset to integers, matches format from instrument)
-        self.b1 = np.array([[-30, -295, -514, -234, -188, 203, -325, 305, -204, -294]])
-        self.b2 = np.array([[180, -132, 213, 309, 291, 49, 188, 373, 2, 172]])
-        self.b3 = np.array([[-398, -436, -131, -473, -443, 188, -168, 291, -179, 8]])
-        self.b4 = np.array([[-216, -605, -92, -58, 484, -5, 338, 175, -80, -549]])
-
-        self.pg1 = np.array([[100, 100, 26,  24, 25, 25,  24, 26, 100, 100]])
-        self.pg2 = np.array([[100, 100, 90, 80, 60, 50, 100,  24, 25, 26]])
-        self.pg3 = np.array([[26, 100, 100, 90, 80, 70, 60, 50,  24, 25]])
-        self.pg4 = np.array([[25, 26, 100,  24, 25, 26, 100, 100, 100,  24]])
-
-        self.echo = np.array([[0, 25, 50, 75, 100, 125, 150, 175, 200, 225, 250]])
-
-        self.sfactor = 0.45
-        self.heading = 9841  # units are centidegrees
-        self.pitch = 69  # units are centidegrees
-        self.roll = -254  # units are centidegrees
-        self.orient = 1
-        self.lat = 50.0000
-        self.lon = -145.0000
-        self.depth = 0.0
-        self.ntp = 3545769600.0    # May 12, 2012
+        cls.b1 = np.array([[-30, -295, -514, -234, -188, 203, -325, 305, -204, -294]])
+        cls.b2 = np.array([[180, -132, 213, 309, 291, 49, 188, 373, 2, 172]])
+        cls.b3 = np.array([[-398, -436, -131, -473, -443, 188, -168, 291, -179, 8]])
+        cls.b4 = np.array([[-216, -605, -92, -58, 484, -5, 338, 175, -80, -549]])
+
+        cls.pg1 = np.array([[100, 100, 26,  24, 25, 25,  24, 26, 100, 100]])
+        cls.pg2 = np.array([[100, 100, 90, 80, 60, 50, 100,  24, 25, 26]])
+        cls.pg3 = np.array([[26, 100, 100, 90, 80, 70, 60, 50,  24, 25]])
+        cls.pg4 = np.array([[25, 26, 100,  24, 25, 26, 100, 100, 100,  24]])
+
+        cls.echo = np.array([[0, 25, 50, 75, 100, 125, 150, 175, 200, 225, 250]])
+
+        cls.sfactor = np.float64(0.45)
+        cls.heading = np.int64(9841)  # units are centidegrees
+        cls.pitch = np.int64(69)  # units are centidegrees
+        cls.roll = np.int64(-254)  # units are centidegrees
+        cls.orient = np.int64(1)
+        cls.lat = np.float64(50.0000)
+        cls.lon = np.float64(-145.0000)
+        cls.depth = np.float64(0.0)
+        cls.ntp = np.float64(3545769600.0)    # May 12, 2012
 
         # set expected results -- velocity profiles in earth coordinates (values in DPS)
-        self.u = np.array([[0.2175, -0.2814, -0.1002, 0.4831, 1.2380,
-                            -0.2455, 0.6218, -0.1807, 0.0992, -0.9063]]) * 1000.
-        self.v = np.array([[-0.3367, -0.1815, -1.0522, -0.8676, -0.8919,
-                            0.2585, -0.8497, -0.0873, -0.3073, -0.5461]]) * 1000.
-        self.w = np.array([[0.1401,  0.3977,  0.1870,  0.1637,  0.0091,
-                            -0.1290,  0.0334, -0.3017, 0.1384, 0.1966]]) * 1000.
-        self.e = np.array([[0.789762, 0.634704, -0.080630, 0.626434, 0.064090,
-                            0.071326, -0.317352, 0.219148, 0.054787, 0.433129]]) * 1000.
+        cls.u = np.array([[0.2175, -0.2814, -0.1002, 0.4831, 1.2380,
+                           -0.2455, 0.6218, -0.1807, 0.0992, -0.9063]], dtype=np.float64) * 1000.
+        cls.v = np.array([[-0.3367, -0.1815, -1.0522, -0.8676, -0.8919,
+                           0.2585, -0.8497, -0.0873, -0.3073, -0.5461]], dtype=np.float64) * 1000.
+        cls.w = np.array([[0.1401,  0.3977,  0.1870,  0.1637,  0.0091,
+                           -0.1290,  0.0334, -0.3017, 0.1384, 0.1966]], dtype=np.float64) * 1000.
+        cls.e = np.array([[0.789762, 0.634704, -0.080630, 0.626434, 0.064090,
+                           0.071326, -0.317352, 0.219148, 0.054787, 0.433129]], dtype=np.float64) * 1000.
 
         # set expected results -- magnetic variation correction applied
-        self.u_cor = np.array([[0.1099, -0.3221, -0.4025, 0.2092, 0.9243,
-                                -0.1595, 0.3471, -0.1983, 0.0053, -1.0261]])
-        self.v_cor = np.array([[-0.3855, -0.0916, -0.9773, -0.9707, -1.2140,
-                                0.3188, -0.9940, -0.0308, -0.3229, -0.2582]])
+        cls.u_cor = np.array([[0.1099, -0.3221, -0.4025, 0.2092, 0.9243,
+                               -0.1595, 0.3471, -0.1983, 0.0053, -1.0261]], dtype=np.float64)
+        cls.v_cor = np.array([[-0.3855, -0.0916, -0.9773, -0.9707, -1.2140,
+                               0.3188, -0.9940, -0.0308, -0.3229, -0.2582]], dtype=np.float64)
+
+        # set expected results -- beam coordinate inputs, adjusted to include a 3-beam solution (computed in Matlab
+        # using modifications to functions found in the scripts included with this repo).
+        cls.u_cor_3beam = np.array([[0.1099, -0.3221, -0.4025, np.nan, 0.9243,
+                                     -0.1595, 0.5387, -0.0651, -0.0726, -0.4735]], dtype=np.float64)
+        cls.v_cor_3beam = np.array([[-0.3854, -0.0916, -0.9773, np.nan, -1.2140,
+                                     0.3188, -0.5926, 0.2514, -0.2932, -0.5255]], dtype=np.float64)
+        cls.w_3beam = np.array([[0.1401, 0.3977, 0.1870, np.nan, 0.0091,
+                                 -0.1290, -0.0681, -0.2591, 0.1215, 0.0926]], dtype=np.float64)
+        cls.e_3beam = np.array([[0.7898,  0.6347, -0.0806, np.nan, 0.0641,
+                                 0.07133, 0., 0., 0., 0.]], dtype=np.float64)
 
         # set the expected results -- echo intensity conversion from counts to dB
-        self.dB = np.array([[0.00, 11.25, 22.50, 33.75, 45.00, 56.25, 67.50, 78.75, 90.00, 101.25, 112.50]])
+        cls.dB = np.array([[0.00, 11.25, 22.50, 33.75, 45.00, 56.25, 67.50, 78.75, 90.00, 101.25, 112.50]],
+                          dtype=np.float64)
+
+        # none of the tests should modify the shared fixtures, make sure of it
+        for value in vars(cls).values():
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
 
     def test_adcp_beam(self):
         """
@@ -108,14 +143,59 @@ class TestADCPFunctionsUnit(BaseUnitTestCase):
             then derived from the function itself and included as part of the unit
             test within this code (test_adcp_beam).
         """
-        # adjust expected test values to include a 3-beam solution (computed in Matlab using modifications to functions
-        # found in the scripts included with this repo).
-        u_cor = np.array([[0.1099, -0.3221, -0.4025, np.nan, 0.9243, -0.1595, 0.5387, -0.0651, -0.0726, -0.4735]])
-        v_cor = np.array([[-0.3854, -0.0916, -0.9773, np.nan, -1.2140, 0.3188, -0.5926, 0.2514, -0.2932, -0.5255]])
-        w = np.array([[0.1401, 0.3977, 0.1870, np.nan, 0.0091, -0.1290, -0.0681, -0.2591, 0.1215, 0.0926]])
-        e = np.array([[0.7898,  0.6347, -0.0806, np.nan, 0.0641, 0.07133, 0., 0., 0., 0.]])
-
-        # single record case
+        for n in (1, NREC_FULL):
+            self._run_beam_case(n)
+
+    def _run_beam_case(self, n):
+        """
+        Runs the adcp_beam_* test case for n identical records.
+        """
+        # set the expected results for n records
+        u_cor = _rep(self.u_cor_3beam, n)
+        v_cor = _rep(self.v_cor_3beam, n)
+        w = _rep(self.w_3beam, n)
+        e = _rep(self.e_3beam, n)
+
+        # set the test inputs for n records
+        b1 = _rep(self.b1, n)
+        b2 = _rep(self.b2, n)
+        b3 = _rep(self.b3, n)
+        b4 = _rep(self.b4, n)
+        pg1 = _rep(self.pg1, n)
+        pg2 = _rep(self.pg2, n)
+        pg3 = _rep(self.pg3, n)
+        pg4 = _rep(self.pg4, n)
+        heading = np.broadcast_to(self.heading, (n,))
+        pitch = np.broadcast_to(self.pitch, (n,))
+        roll = np.broadcast_to(self.roll, (n,))
+        orient = np.broadcast_to(self.orient, (n,))
+        lat = np.broadcast_to(self.lat, (n,))
+        lon = np.broadcast_to(self.lon, (n,))
+        ntp = np.broadcast_to(self.ntp, (n,))
+
+        got_u_cor = af.adcp_beam_eastward(b1, b2, b3, b4, pg1, pg2, pg3, pg4,
+                                          heading, pitch, roll, orient,
+                                          lat, lon, ntp)
+        got_v_cor = af.adcp_beam_northward(b1, b2, b3, b4, pg1, pg2, pg3, pg4,
+                                           heading, pitch, roll, orient,
+                                           lat, lon, ntp)
+        got_w = af.adcp_beam_vertical(b1, b2, b3, b4, pg1, pg2, pg3, pg4,
+                                      heading, pitch, roll, orient)
+        got_e = af.adcp_beam_error(b1, b2, b3, b4, pg1, pg2, pg3, pg4,)
+
+        # test results
+        np.testing.assert_allclose(got_u_cor, u_cor, rtol=0, atol=1.5e-4, equal_nan=True)
+        np.testing.assert_allclose(got_v_cor, v_cor, rtol=0, atol=1.5e-4, equal_nan=True)
+        np.testing.assert_allclose(got_w, w, rtol=0, atol=1.5e-4, equal_nan=True)
+        np.testing.assert_allclose(got_e, e, rtol=0, atol=1.5e-4, equal_nan=True)
+
+    def test_adcp_beam_functions(self):
+        """
+        Calls each of the DPA functions adcp_beam_eastward, adcp_beam_northward,
+        adcp_beam_vertical, and adcp_beam_error with scalar compass, orientation
+        and time inputs for a single record, rather than the 1D arrays used in
+        test_adcp_beam.
+        """
         got_u_cor = af.adcp_beam_eastward(self.b1, self.b2, self.b3, self.b4,
                                           self.pg1, self.pg2, self.pg3, self.pg4,
                                           self.heading, self.pitch, self.roll, self.orient,
@@ -130,50 +210,10 @@ class TestADCPFunctionsUnit(BaseUnitTestCase):
         got_e = af.adcp_beam_error(self.b1, self.b2, self.b3, self.b4, self.pg1, self.pg2, self.pg3, self.pg4,)
 
         # test results
-        np.testing.assert_array_almost_equal(got_u_cor, u_cor, 4)
-        np.testing.assert_array_almost_equal(got_v_cor, v_cor, 4)
-        np.testing.assert_array_almost_equal(got_w, w, 4)
-        np.testing.assert_array_almost_equal(got_e, e, 4)
-
-        # reset the test inputs for multiple records
-        b1 = np.tile(self.b1, (24, 1))
-        b2 = np.tile(self.b2, (24, 1))
-        b3 = np.tile(self.b3, (24, 1))
-        b4 = np.tile(self.b4, (24, 1))
-        pg1 = np.tile(self.pg1, (24, 1))
-        pg2 = np.tile(self.pg2, (24, 1))
-        pg3 = np.tile(self.pg3, (24, 1))
-        pg4 = np.tile(self.pg4, (24, 1))
-        heading = np.ones(24, dtype=np.int) * self.heading
-        pitch = np.ones(24, dtype=np.int) * self.pitch
-        roll = np.ones(24, dtype=np.int) * self.roll
-        orient = np.ones(24, dtype=np.int) * self.orient
-        lat = np.ones(24) * self.lat
-        lon = np.ones(24) * self.lon
-        ntp = np.ones(24) * self.ntp
-
-        # reset outputs for multiple records
-        u_cor = np.tile(u_cor, (24, 1))
-        v_cor = np.tile(v_cor, (24, 1))
-        w = np.tile(w, (24, 1))
-        e = np.tile(e, (24, 1))
-
-        # multiple record case
-        got_u_cor = af.adcp_beam_eastward(b1, b2, b3, b4, pg1, pg2, pg3, pg4,
-                                          heading, pitch, roll, orient,
-                                          lat, lon, ntp)
-        got_v_cor = af.adcp_beam_northward(b1, b2, b3, b4, pg1, pg2, pg3, pg4,
-                                           heading, pitch, roll, orient,
-                                           lat, lon, ntp)
-        got_w = af.adcp_beam_vertical(b1, b2, b3, b4, pg1, pg2, pg3, pg4,
-                                      heading, pitch, roll, orient)
-        got_e = af.adcp_beam_error(b1, b2, b3, b4, pg1, pg2, pg3, pg4,)
-
-        # test results
-        np.testing.assert_array_almost_equal(got_u_cor, u_cor, 4)
-        np.testing.assert_array_almost_equal(got_v_cor, v_cor, 4)
-        np.testing.assert_array_almost_equal(got_w, w, 4)
-        np.testing.assert_array_almost_equal(got_e, e, 4)
+        np.testing.assert_allclose(got_u_cor, self.u_cor_3beam, rtol=0, atol=1.5e-4, equal_nan=True)
+        np.testing.assert_allclose(got_v_cor, self.v_cor_3beam, rtol=0, atol=1.5e-4, equal_nan=True)
+        np.testing.assert_allclose(got_w, self.w_3beam, rtol=0, atol=1.5e-4, equal_nan=True)
+        np.testing.assert_allclose(got_e, self.e_3beam, rtol=0, atol=1.5e-4, equal_nan=True)
 
     def test_adcp_earth(self):
         """
@@ -199,46 +239,59 @@ class TestADCPFunctionsUnit(BaseUnitTestCase):
                         and incorporated instrument fill value (system fill values do
                         not occur).
         """
+        # the single record case uses the floating point velocities and scalar
+        # ancillary inputs, the multiple record case adds integer velocities
+        # with instrument fill values
+        for n, fill in ((1, False), (NREC, True)):
+            self._run_earth_case(n, fill)
+
+    def _run_earth_case(self, n, fill):
+        """
+        Runs the adcp_earth_* test case for n identical records, optionally
+        with integer velocities containing instrument fill values.
+        """
+        # set the test inputs for n records
+        u = _rep(self.u, n)
+        v = _rep(self.v, n)
+        w = _rep(self.w, n)
+        e = _rep(self.e, n)
+        if n == 1:
+            # a single record uses the scalar depth, location and time inputs
+            depth, lat, lon, ntp = self.depth, self.lat, self.lon, self.ntp
+        else:
+            depth = np.broadcast_to(self.depth, (n,))
+            lat = np.broadcast_to(self.lat, (n,))
+            lon = np.broadcast_to(self.lon, (n,))
+            ntp = np.broadcast_to(self.ntp, (n,))
+
+        # set the expected results for n records
+        u_cor = _rep(self.u_cor, n)
+        v_cor = _rep(self.v_cor, n)
+        atol = 1.5e-4
+
+        if fill:
+            # astype and copy give writable arrays for the records modified here
+            u = u.astype(int)
+            u[:, (2, 5, 7)] = ADCP_FILLVALUE
+            v = v.astype(int)
+            v[:, (2, 5, 7)] = ADCP_FILLVALUE
+            u_cor = u_cor.copy()
+            u_cor[:, (2, 5, 7)] = np.nan
+            v_cor = v_cor.copy()
+            v_cor[:, (2, 5, 7)] = np.nan
+            # relax precision to account for integer/float round off errors
+            atol = 1.5e-3
+
         # test the magnetic variation correction and simple scaling functions
-        got_u_cor = af.adcp_earth_eastward(self.u, self.v, self.depth, self.lat, self.lon, self.ntp)
-        got_v_cor = af.adcp_earth_northward(self.u, self.v, self.depth, self.lat, self.lon, self.ntp)
-        got_w = af.adcp_earth_vertical(self.w)
-        got_e = af.adcp_earth_error(self.e)
-
-        np.testing.assert_array_almost_equal(got_u_cor, self.u_cor, 4)
-        np.testing.assert_array_almost_equal(got_v_cor, self.v_cor, 4)
-        np.testing.assert_array_almost_equal(got_w, self.w / 1000., 4)
-        np.testing.assert_array_almost_equal(got_e, self.e / 1000., 4)
-
-        # reset the test inputs for multiple records
-        u = np.tile(self.u, (24, 1)).astype(int)
-        u[:, (2, 5, 7)] = ADCP_FILLVALUE
-        v = np.tile(self.v, (24, 1)).astype(int)
-        v[:, (2, 5, 7)] = ADCP_FILLVALUE
-        w = np.tile(self.w, (24, 1))
-        e = np.tile(self.e, (24, 1))
-        depth = np.ones(24) * self.depth
-        lat = np.ones(24) * self.lat
-        lon = np.ones(24) * self.lon
-        ntp = np.ones(24) * self.ntp
-
-        # reset expected results for multiple records
-        u_cor = np.tile(self.u_cor, (24, 1))
-        u_cor[:, (2, 5, 7)] = np.nan
-        v_cor = np.tile(self.v_cor, (24, 1))
-        v_cor[:, (2, 5, 7)] = np.nan
-
-        # compute the results for multiple records
         got_u_cor = af.adcp_earth_eastward(u, v, depth, lat, lon, ntp)
         got_v_cor = af.adcp_earth_northward(u, v, depth, lat, lon, ntp)
         got_w = af.adcp_earth_vertical(w)
         got_e = af.adcp_earth_error(e)
 
-        # test the magnetic variation correction (relaxing precision to account for integer/float round off errors)
-        np.testing.assert_array_almost_equal(got_u_cor, u_cor, 3)
-        np.testing.assert_array_almost_equal(got_v_cor, v_cor, 3)
-        np.testing.assert_array_almost_equal(got_w, w / 1000., 4)
-        np.testing.assert_array_almost_equal(got_e, e / 1000., 4)
+        np.testing.assert_allclose(got_u_cor, u_cor, rtol=0, atol=atol, equal_nan=True)
+        np.testing.assert_allclose(got_v_cor, v_cor, rtol=0, atol=atol, equal_nan=True)
+        np.testing.assert_allclose(got_w, w / 1000., rtol=0, atol=1.5e-4, equal_nan=True)
+        np.testing.assert_allclose(got_e, e / 1000., rtol=0, atol=1.5e-4, equal_nan=True)
 
     def test_adcp_backscatter(self):
         """
@@ -259,16 +312,16 @@ class TestADCPFunctionsUnit(BaseUnitTestCase):
         """
         # the single record case
         got = af.adcp_backscatter(self.echo, self.sfactor)
-        np.testing.assert_array_almost_equal(got, self.dB, 4)
+        np.testing.assert_allclose(got, self.dB, rtol=0, atol=1.5e-4, equal_nan=True)
 
         # the multi-record case -- inputs
-        raw = np.tile(self.echo, (24, 1))
-        sf = np.ones(24) * self.sfactor
+        raw = _rep(self.echo)
+        sf = np.broadcast_to(self.sfactor, (NREC,))
 
         # the multi-record case -- outputs
-        dB = np.tile(self.dB, (24, 1))
+        dB = _rep(self.dB)
         got = af.adcp_backscatter(raw, sf)
-        np.testing.assert_array_almost_equal(got, dB, 4)
+        np.testing.assert_allclose(got, dB, rtol=0, atol=1.5e-4, equal_nan=True)
 
     def test_vadcp_beam_vertical_true(self):
         """
@@ -283,16 +336,18 @@ class TestADCPFunctionsUnit(BaseUnitTestCase):
             2019-08-14: Christopher Wingard. Reset to only test the vadcp_beam_vertical_true function.
         """
         # inputs
-        b1 = np.ones((10, 10), dtype=np.int) * -325
-        b2 = np.ones((10, 10), dtype=np.int) * 188
-        b3 = np.ones((10, 10), dtype=np.int) * 168
-        b4 = np.ones((10, 10), dtype=np.int) * -338
-        b5 = np.ones((10, 10), dtype=np.int) * -70
-        pg1 = np.ones((10, 10), dtype=np.int) * 100
-        pg2 = np.ones((10, 10), dtype=np.int) * 100
-        pg3 = np.ones((10, 10), dtype=np.int) * 100
-        pg4 = np.ones((10, 10), dtype=np.int) * 100
-        pg5 = np.ones((10, 10), dtype=np.int) * 100
+        # read-only broadcast views for the constant inputs, writable arrays for
+        # the percent good inputs that are modified below
+        b1 = np.broadcast_to(np.int64(-325), (10, 10))
+        b2 = np.broadcast_to(np.int64(188), (10, 10))
+        b3 = np.broadcast_to(np.int64(168), (10, 10))
+        b4 = np.broadcast_to(np.int64(-338), (10, 10))
+        b5 = np.broadcast_to(np.int64(-70), (10, 10))
+        pg1 = np.full((10, 10), 100, dtype=np.int64)
+        pg2 = np.full((10, 10), 100, dtype=np.int64)
+        pg3 = np.broadcast_to(np.int64(100), (10, 10))
+        pg4 = np.broadcast_to(np.int64(100), (10, 10))
+        pg5 = np.full((10, 10), 100, dtype=np.int64)
 
         # create some bad data points, which should yield NaNs for output
         pg1[:, (2, 3)] = 24
@@ -304,18 +359,18 @@ class TestADCPFunctionsUnit(BaseUnitTestCase):
                             32, 32, 32, 32, 32]) * 100
         pitch = np.array([0, 2, 3, 3, 1, 2, 2, 3, 3, 1]) * 100
         roll = np.array([0, 4, 3, 4, 3, 3, 4, 3, 4, 3]) * 100
-        orient = np.ones(10, dtype=np.int)
+        orient = np.broadcast_to(np.int64(1), (10,))
 
         # expected outputs
         vlu_5bm_xpctd = np.array([[0.07000000, -0.00824854, -0.00804866, -0.02112871, 0.01775751,
-                                   0.00485518, -0.00824854, -0.00804866, -0.02112871, 0.01775751]])
+                                   0.00485518, -0.00824854, -0.00804866, -0.02112871, 0.01775751]], dtype=np.float64)
         vlu_5bm_xpctd = np.tile(vlu_5bm_xpctd.T, (1, 10))
         vlu_5bm_xpctd[:, (2, 3, 9)] = np.nan
 
         vlu_5bm_calc = af.vadcp_beam_vertical_true(b1, b2, b3, b4, b5, pg1, pg2, pg3, pg4, pg5,
                                                    heading, pitch, roll, orient)
 
-        np.testing.assert_array_almost_equal(vlu_5bm_calc, vlu_5bm_xpctd, 6)
+        np.testing.assert_allclose(vlu_5bm_calc, vlu_5bm_xpctd, rtol=0, atol=1.5e-6, equal_nan=True)
 
     def test_adcp_ins2earth_orientation(self):
         """
@@ -333,9 +388,9 @@ class TestADCPFunctionsUnit(BaseUnitTestCase):
         """
         # input values: these are the output of adcp_beam2inst in test_vadcp_beam
         # (velocities are in instrument coordinates)
-        u = np.array([[-749.95582864]])
-        v = np.array([[-739.72251324]])
-        w = np.array([[-81.67564404]])
+        u = np.array([[-749.95582864]], dtype=np.float64)
+        v = np.array([[-739.72251324]], dtype=np.float64)
+        w = np.array([[-81.67564404]], dtype=np.float64)
         heading = np.array([3200])  # units of centidegrees
         pitch = np.array([300])  # units of centidegrees
         roll = np.array([400])  # units of centidegrees
@@ -345,9 +400,9 @@ class TestADCPFunctionsUnit(BaseUnitTestCase):
 
         # expected outputs, earth coordinates, upwards case, from test_vadcp_beam which
         # agrees with the test matlab code values to (much) better than single precision.
-        vle = np.array([[247.015599]])
-        vln = np.array([[-1027.223026]])
-        vlu = np.array([[-9.497397]])
+        vle = np.array([[247.015599]], dtype=np.float64)
+        vln = np.array([[-1027.223026]], dtype=np.float64)
+        vlu = np.array([[-9.497397]], dtype=np.float64)
         xpctd = np.hstack((vle, vln, vlu))
 
         # calculated upwards looking case
@@ -355,15 +410,15 @@ class TestADCPFunctionsUnit(BaseUnitTestCase):
         calc = np.hstack((uu, vv, ww))
 
         # test results
-        np.testing.assert_array_almost_equal(calc, xpctd, 6)
+        np.testing.assert_allclose(calc, xpctd, rtol=0, atol=1.5e-6, equal_nan=True)
 
         # primary test: downwards looking case.
         orient_0 = np.array([0])
 
         # expected outputs, earth coordinates, downwards case, from matlab test code
-        vle = np.array([[-1029.9328104]])
-        vln = np.array([[-225.7064203]])
-        vlu = np.array([[-67.7426771]])
+        vle = np.array([[-1029.9328104]], dtype=np.float64)
+        vln = np.array([[-225.7064203]], dtype=np.float64)
+        vlu = np.array([[-67.7426771]], dtype=np.float64)
         xpctd = np.hstack((vle, vln, vlu))
 
         # calculated downwards looking case
@@ -371,7 +426,7 @@ class TestADCPFunctionsUnit(BaseUnitTestCase):
         calc = np.hstack((uu, vv, ww))
 
         # test results
-        np.testing.assert_array_almost_equal(calc, xpctd, 6)
+        np.testing.assert_allclose(calc, xpctd, rtol=0, atol=1.5e-6, equal_nan=True)
 
     def test_adcp_bin_depths_meters(self):
         """
@@ -384,69 +439,51 @@ class TestADCPFunctionsUnit(BaseUnitTestCase):
         """
         sfill = SYSTEM_FILLVALUE
 
-        ### scalar time case (1) - adcp looking up
-        # test inputs - note, CI will be sending these into the DPAs as ndarrays, not python scalars.
-        adcp_orientation = 1
-        bin_size = 400
-        dist_first_bin = 900
-        num_bins = 29
-        sensor_depth = 450
         # expected outputs
         # note that the output should be a row vector, not a 1D array.
-        xpctd_bins_up = np.array([[441., 437., 433., 429., 425., 421., 417., 413., 409., 405., 401., 397., 393., 389.,
-                                  385., 381., 377., 373., 369., 365., 361., 357., 353., 349., 345., 341., 337., 333.,
-                                  329.]])
-         # calculate bin depths
-        calc_bins_up = af.adcp_bin_depths_meters(dist_first_bin, bin_size, num_bins, sensor_depth, adcp_orientation)
+        xpctd_bins_up = (441. - 4. * np.arange(29))[None, :]
+        xpctd_bins_down = (16. + 4. * np.arange(29))[None, :]
 
-        # compare calculated results to expected results
+        ### scalar time case (1) - adcp looking up
+        # test inputs - note, CI will be sending these into the DPAs as ndarrays, not python scalars.
+        calc_bins_up = af.adcp_bin_depths_meters(900, 400, 29, 450, 1)
         np.testing.assert_allclose(calc_bins_up, xpctd_bins_up, rtol=0.000001, atol=0.000001)
 
-        ### scalar time case (2) - adcp looking down
-        # test inputs
-        adcp_orientation = np.array([0])
-        bin_size = np.array([400])
-        dist_first_bin = np.array([900])
-        num_bins = np.array([29])
-        sensor_depth = np.array([7])
-        # expected outputs
-        xpctd_bins_down = np.array([[16., 20., 24., 28., 32., 36., 40., 44., 48., 52., 56., 60., 64., 68., 72., 76., 80.,
-                                    84., 88., 92., 96., 100., 104., 108., 112., 116., 120., 124., 128.]])
-        # calculate bin depths
-        calc_bins_down = af.adcp_bin_depths_meters(dist_first_bin, bin_size, num_bins, sensor_depth, adcp_orientation)
-
-        # compare calculated results to expected results
+        ### scalar time case (2) - adcp looking down, 1-element array inputs
+        calc_bins_down = af.adcp_bin_depths_meters(np.array([900]), np.array([400]), np.array([29]),
+                                                   np.array([7]), np.array([0]))
         np.testing.assert_allclose(calc_bins_down, xpctd_bins_down, rtol=0.000001, atol=0.000001)
 
-        ### time-vectorized case; cat the above two scalar cases together.
-        # inputs
-        dist_first_bin = np.array([900, 900])
-        bin_size = np.array([400, 400])
-        num_bins = np.array([29, 29])
-        sensor_depth = np.array([450, 7])
-        adcp_orientation = np.array([1, 0])
-        # expected
-        xpctd_bins = np.vstack((xpctd_bins_up, xpctd_bins_down))
-        # calculated
-        calc_bins = af.adcp_bin_depths_meters(dist_first_bin, bin_size, num_bins, sensor_depth, adcp_orientation)
-        # compare calculated results to expected results
-        np.testing.assert_allclose(calc_bins, xpctd_bins, rtol=0.000001, atol=0.000001)
+        ### time-vectorized cases
+        # the exemplar cases below are concatenated in time and run through the
+        # DPA in a single call, then sliced back out. Index layout of the records:
+        #     [0]     the scalar time case (1) record - adcp looking up
+        #     [1]     the scalar time case (2) record - adcp looking down
+        #     [2:4]   cat the above two records together.
+        #     [4:10]  time-vectorized fill cases - test the action on a fill value in each of
+        #             the 5 input data streams, plus one instance of all good data.
+        # NOTE: DPA uses only first num_bins value, so the fill in record 7 is ignored.
+        dist_first_bin = np.concatenate([[900], [900], [900, 900], [900, sfill, 900, 900, 900, 900]])
+        bin_size = np.concatenate([[400], [400], [400, 400], [400, 400, sfill, 400, 400, 400]])
+        num_bins = np.concatenate([[29], [29], [29, 29], [29, 29, 29, sfill, 29, 29]])
+        sensor_depth = np.concatenate([[450], [7], [450, 7], [450, 7, 450, 7, 450, sfill]])
+        adcp_orientation = np.concatenate([[1], [0], [1, 0], [1, 0, 1, 0, sfill, 0]])
 
-        ### time-vectorized fill cases - test the action on a fill value in each of the 5 input data streams,
-        # plus one instance of all good data.
-        num_bins = np.array([29, 29, 29, sfill, 29, 29])  # NOTE: DPA uses only first num_bins value
-        dist_first_bin = np.array([900, sfill, 900, 900, 900, 900])
-        bin_size = np.array([400, 400, sfill, 400, 400, 400])
-        sensor_depth = np.array([450, 7, 450, 7, 450, sfill])
-        adcp_orientation = np.array([1, 0, 1, 0, sfill, 0])
-        # 1st and 4th rows will have non-Nan data.
-        xpctd_bins = np.tile(np.nan, (6, 29))
-        xpctd_bins[0, :] = xpctd_bins_up
-        xpctd_bins[3, :] = xpctd_bins_down
-        # calculated
+        # expected outputs
+        xpctd_bins_cat = np.vstack((xpctd_bins_up, xpctd_bins_down))
+        # 1st and 4th rows of the fill cases will have non-Nan data.
+        xpctd_bins_fill = np.tile(np.nan, (6, 29))
+        xpctd_bins_fill[0, :] = xpctd_bins_up
+        xpctd_bins_fill[3, :] = xpctd_bins_down
+
+        # calculate bin depths
         calc_bins = af.adcp_bin_depths_meters(dist_first_bin, bin_size, num_bins, sensor_depth, adcp_orientation)
+
         # compare calculated results to expected results
-        np.testing.assert_allclose(calc_bins, xpctd_bins, rtol=0.000001, atol=0.000001)
+        np.testing.assert_allclose(calc_bins[0:1], xpctd_bins_up, rtol=0.000001, atol=0.000001)
+        np.testing.assert_allclose(calc_bins[1:2], xpctd_bins_down, rtol=0.000001, atol=0.000001)
+        np.testing.assert_allclose(calc_bins[2:4], xpctd_bins_cat, rtol=0.000001, atol=0.000001)
+        np.testing.assert_allclose(calc_bins[4:10], xpctd_bins_fill, rtol=0.000001, atol=0.000001)
 
     def test_adcp_bin_depths_dapa(self):
         """
@@ -461,71 +498,9 @@ class TestADCPFunctionsUnit(BaseUnitTestCase):
         """
         sfill = SYSTEM_FILLVALUE
 
-        ### scalar time case (1) - adcp looking up
-        # test inputs - note, CI will be sending these into the DPAs as ndarrays, not python scalars.
-        # test inputs
-        adcp_orientation = np.array([1])
-        bin_size = np.array([400])
-        dist_first_bin = np.array([900])
-        latitude = np.array([4.0])
-        num_bins = np.array([10])
         # input adcp pressure has units of decaPascals
-        pressure = np.array([600000])
-        # according to the z_from_p check value at 600db, this gives a depth of 595.8262 m
-        # expected outputs
-        # note that the output should be a row vector, not a 1D array.
-        expected_bins_up = 0.8253480 + np.array([[586, 582, 578, 574, 570, 566, 562, 558, 554, 550]])
-        # calculate bin depths
-        calculated_bins = af.adcp_bin_depths_dapa(dist_first_bin, bin_size, num_bins, pressure, adcp_orientation, latitude)
-        # compare calculated results to expected results
-        np.testing.assert_allclose(calculated_bins, expected_bins_up, rtol=0.0, atol=0.000001)
-
-        ### scalar time case (2) - adcp looking down
-        # test inputs - should also work with python scalars, but this is not necessary
-        adcp_orientation = 0
-        bin_size = 400
-        dist_first_bin = 900
-        latitude = 4.0
-        num_bins = 10
-        pressure = 10000
-        # expected depth from a pressure of 10000 decapascals is 9.94460074 m
-        # expected outputs
-        expected_bins_down = 0.9445834 + np.array([[18, 22, 26, 30, 34, 38, 42, 46, 50, 54]])
-        # calculate bin depths
-        calculated_bins = af.adcp_bin_depths_dapa(dist_first_bin, bin_size, num_bins, pressure, adcp_orientation, latitude)
-        # compare calculated results to expected results
-        np.testing.assert_allclose(calculated_bins, expected_bins_down, rtol=0.0, atol=0.000001)
-
-        ### time-vectorized test - combine the 2 above
-        adcp_orientation = np.array([1, 0])
-        bin_size = np.array([400, 400])
-        dist_first_bin = np.array([900, 900])
-        latitude = np.array([4.0, 4.0])
-        num_bins = np.array([10, 10])
-        pressure = np.array([600000, 10000])
-        #
-        expected_bins = np.vstack((expected_bins_up, expected_bins_down))
-        #
-        calculated_bins = af.adcp_bin_depths_dapa(dist_first_bin, bin_size, num_bins, pressure, adcp_orientation, latitude)
-        #
-        np.testing.assert_allclose(calculated_bins, expected_bins, rtol=0.0, atol=0.001)
-
-        ### time-vectorized fill cases - test the action on a fill value in each of the 5 input data streams,
-        # plus one instance of all good data.
-        num_bins = np.array([10, 10, 10, sfill, 10, 10])  # NOTE: DPA uses only first num_bins value
-        dist_first_bin = np.array([900, sfill, 900, 900, 900, 900])
-        bin_size = np.array([400, 400, sfill, 400, 400, 400])
-        pressure = np.array([600000, 10000, 600000, 10000, 600000, sfill])
-        adcp_orientation = np.array([1, 0, 1, 0, sfill, 0])
-        latitude = np.array([4.0, 4.0, 4.0, 4.0, 4.0, 4.0])
-        # 1st and 4th rows will have non-Nan data.
-        expected_bins = np.tile(np.nan, (6, 10))
-        expected_bins[0, :] = expected_bins_up
-        expected_bins[3, :] = expected_bins_down
-        # calculated
-        calculated_bins = af.adcp_bin_depths_dapa(dist_first_bin, bin_size, num_bins, pressure, adcp_orientation, latitude)
-        # compare calculated results to expected results
-        np.testing.assert_allclose(calculated_bins, expected_bins, rtol=0.0, atol=0.001)
+        self._run_bin_depths(af.adcp_bin_depths_dapa, 600000, 10000, [600000, 10000],
+                             [600000, 10000, 600000, 10000, 600000, sfill])
 
     def test_adcp_bin_depths_bar(self):
         """
@@ -540,22 +515,32 @@ class TestADCPFunctionsUnit(BaseUnitTestCase):
         """
         sfill = SYSTEM_FILLVALUE
 
+        # water pressure of gliders has units of bar
+        self._run_bin_depths(af.adcp_bin_depths_bar, 60, 1, [60, 1],
+                             [60, 1, 60, 1, 60, sfill])
+
+    def _run_bin_depths(self, dpa_fn, p_up_scalar, p_down_scalar, p_vec, p_fill):
+        """
+        Runs the bin depth test cases shared by the adcp_bin_depths_dapa and
+        adcp_bin_depths_bar functions, given the pressures (600 db up-looking
+        and 10 db down-looking) in the units the DPA function expects.
+        """
+        sfill = SYSTEM_FILLVALUE
+
         ### scalar time case (1) - adcp looking up
         # test inputs - note, CI will be sending these into the DPAs as ndarrays, not python scalars.
-        # test inputs
         adcp_orientation = np.array([1])
         bin_size = np.array([400])
         dist_first_bin = np.array([900])
-        latitude = np.array([4.0])
+        latitude = np.array([4.0], dtype=np.float64)
         num_bins = np.array([10])
-        # water pressure of gliders has units of bar
-        pressure = np.array([60])
+        pressure = np.array([p_up_scalar])
         # according to the z_from_p check value at 600db, this gives a depth of 595.8262 m
         # expected outputs
         # note that the output should be a row vector, not a 1D array.
-        expected_bins_up = 0.8253480 + np.array([[586, 582, 578, 574, 570, 566, 562, 558, 554, 550]])
+        expected_bins_up = 0.8253480 + (586. - 4. * np.arange(10))[None, :]
         # calculate bin depths
-        calculated_bins = af.adcp_bin_depths_bar(dist_first_bin, bin_size, num_bins, pressure, adcp_orientation, latitude)
+        calculated_bins = dpa_fn(dist_first_bin, bin_size, num_bins, pressure, adcp_orientation, latitude)
         # compare calculated results to expected results
         np.testing.assert_allclose(calculated_bins, expected_bins_up, rtol=0.0, atol=0.000001)
 
@@ -566,12 +551,12 @@ class TestADCPFunctionsUnit(BaseUnitTestCase):
         dist_first_bin = 900
         latitude = 4.0
         num_bins = 10
-        pressure = 1
-        # expected depth from a pressure of 1 bar is 9.94460074 m
+        pressure = p_down_scalar
+        # expected depth from a pressure of 10 db is 9.94460074 m
         # expected outputs
-        expected_bins_down = 0.9445834 + np.array([[18, 22, 26, 30, 34, 38, 42, 46, 50, 54]])
+        expected_bins_down = 0.9445834 + (18. + 4. * np.arange(10))[None, :]
         # calculate bin depths
-        calculated_bins = af.adcp_bin_depths_bar(dist_first_bin, bin_size, num_bins, pressure, adcp_orientation, latitude)
+        calculated_bins = dpa_fn(dist_first_bin, bin_size, num_bins, pressure, adcp_orientation, latitude)
         # compare calculated results to expected results
         np.testing.assert_allclose(calculated_bins, expected_bins_down, rtol=0.0, atol=0.000001)
 
@@ -579,13 +564,13 @@ class TestADCPFunctionsUnit(BaseUnitTestCase):
         adcp_orientation = np.array([1, 0])
         bin_size = np.array([400, 400])
         dist_first_bin = np.array([900, 900])
-        latitude = np.array([4.0, 4.0])
+        latitude = np.array([4.0, 4.0], dtype=np.float64)
         num_bins = np.array([10, 10])
-        pressure = np.array([60, 1])
+        pressure = np.array(p_vec)
         #
         expected_bins = np.vstack((expected_bins_up, expected_bins_down))
         #
-        calculated_bins = af.adcp_bin_depths_bar(dist_first_bin, bin_size, num_bins, pressure, adcp_orientation, latitude)
+        calculated_bins = dpa_fn(dist_first_bin, bin_size, num_bins, pressure, adcp_orientation, latitude)
         #
         np.testing.assert_allclose(calculated_bins, expected_bins, rtol=0.0, atol=0.001)
 
@@ -594,15 +579,15 @@ class TestADCPFunctionsUnit(BaseUnitTestCase):
         num_bins = np.array([10, 10, 10, sfill, 10, 10])  # NOTE: DPA uses only first num_bins value
         dist_first_bin = np.array([900, sfill, 900, 900, 900, 900])
         bin_size = np.array([400, 400, sfill, 400, 400, 400])
-        pressure = np.array([60, 1, 60, 1, 60, sfill])
+        pressure = np.array(p_fill)
         adcp_orientation = np.array([1, 0, 1, 0, sfill, 0])
-        latitude = np.array([4.0, 4.0, 4.0, 4.0, 4.0, 4.0])
+        latitude = np.array([4.0, 4.0, 4.0, 4.0, 4.0, 4.0], dtype=np.float64)
         # 1st and 4th rows will have non-Nan data.
         expected_bins = np.tile(np.nan, (6, 10))
         expected_bins[0, :] = expected_bins_up
         expected_bins[3, :] = expected_bins_down
         # calculated
-        calculated_bins = af.adcp_bin_depths_bar(dist_first_bin, bin_size, num_bins, pressure, adcp_orientation, latitude)
+        calculated_bins = dpa_fn(dist_first_bin, bin_size, num_bins, pressure, adcp_orientation, latitude)
         # compare calculated results to expected results
         np.testing.assert_allclose(calculated_bins, expected_bins, rtol=0.0, atol=0.001)
 
@@ -623,11 +608,12 @@ class TestADCPFunctionsUnit(BaseUnitTestCase):
             2015-07-01: Russell Desiderio. Updated check values to TEOS-10 ver. 3.05.
         """
         # test inputs
-        p = np.array([10.0, 50.0, 125.0, 250.0, 600.0, 1000.0])
-        lat = np.ones(6) * 4.0
+        p = np.array([10.0, 50.0, 125.0, 250.0, 600.0, 1000.0], dtype=np.float64)
+        # a scalar latitude is broadcast against the pressures, as in the TEOS-10 check values
+        lat = 4.0
         # outputs
         xpctd = np.array([-9.9445834469453,  -49.7180897012550, -124.2726219409978,
-                          -248.4700576548589, -595.8253480356214, -992.0919060719987])
+                          -248.4700576548589, -595.8253480356214, -992.0919060719987], dtype=np.float64)
         calc = af.z_from_p(p, lat)
         # test relative accuracy
         np.testing.assert_allclose(calc, xpctd, rtol=0.00000001, atol=0.0)
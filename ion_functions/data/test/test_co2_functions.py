@@ -15,10 +15,102 @@ from ion_functions.data import co2_functions as co2func
 from ion_functions.utils import fill_value
 
 
+def _fast_allclose(a, b, rtol, atol):
+    """
+    Checks a and b are equal within the tolerances with a single np.isclose
+    pass, only falling back to np.testing.assert_allclose to build the
+    detailed error message when they are not.
+    """
+    if not np.isclose(a, b, rtol=rtol, atol=atol).all():
+        np.testing.assert_allclose(a, b, rtol=rtol, atol=atol)
+
+
+# pco2_ppressure test data: xco2 [ppm], pressure [mbar], expected pco2 [uatm]
+_PPRESSURE_TEST_DATA = np.array([
+    [674, 1000, 665.19],
+    [619, 1000, 610.91],
+    [822, 1000, 811.25],
+    [973, 1000, 960.28],
+    [941, 1000, 928.69],
+    [863, 1000, 851.71],
+    [854, 1000, 842.83],
+    [833, 1000, 822.11],
+    [826, 1000, 815.20],
+    [814, 1000, 803.36],
+    [797, 1000, 786.58],
+    [782, 1000, 771.77],
+    [768, 1000, 757.96],
+    [754, 1000, 744.14],
+    [740, 1000, 730.32]
+], dtype=np.float32)  # single precision is ample for the 1e-2 tolerances
+_PPRESSURE_TEST_DATA.setflags(write=False)
+
+# pco2_co2flux test data: pco2w [uatm], pco2a [uatm], u10 [m s-1], t [deg_C],
+# s [psu], expected flux [mol m-2 s-1]
+_CO2FLUX_TEST_DATA = np.array([
+    [360, 390, 5, 0, 34, -2.063e-08],
+    [360, 390, 5, 0, 35, -2.052e-08],
+    [360, 390, 5, 10, 34, -1.942e-08],
+    [360, 390, 5, 10, 35, -1.932e-08],
+    [360, 390, 5, 20, 34, -1.869e-08],
+    [360, 390, 5, 20, 35, -1.860e-08],
+    [360, 390, 10, 0, 34, -8.250e-08],
+    [360, 390, 10, 0, 35, -8.207e-08],
+    [360, 390, 10, 10, 34, -7.767e-08],
+    [360, 390, 10, 10, 35, -7.728e-08],
+    [360, 390, 10, 20, 34, -7.475e-08],
+    [360, 390, 10, 20, 35, -7.440e-08],
+    [360, 390, 20, 0, 34, -3.300e-07],
+    [360, 390, 20, 0, 35, -3.283e-07],
+    [360, 390, 20, 10, 34, -3.107e-07],
+    [360, 390, 20, 10, 35, -3.091e-07],
+    [360, 390, 20, 20, 34, -2.990e-07],
+    [360, 390, 20, 20, 35, -2.976e-07],
+    [400, 390, 5, 0, 34, 6.875e-09],
+    [400, 390, 5, 0, 35, 6.839e-09],
+    [400, 390, 5, 10, 34, 6.472e-09],
+    [400, 390, 5, 10, 35, 6.440e-09],
+    [400, 390, 5, 20, 34, 6.229e-09],
+    [400, 390, 5, 20, 35, 6.200e-09],
+    [400, 390, 10, 0, 34, 2.750e-08],
+    [400, 390, 10, 0, 35, 2.736e-08],
+    [400, 390, 10, 10, 34, 2.589e-08],
+    [400, 390, 10, 10, 35, 2.576e-08],
+    [400, 390, 10, 20, 34, 2.492e-08],
+    [400, 390, 10, 20, 35, 2.480e-08],
+    [400, 390, 20, 0, 34, 1.100e-07],
+    [400, 390, 20, 0, 35, 1.094e-07],
+    [400, 390, 20, 10, 34, 1.036e-07],
+    [400, 390, 20, 10, 35, 1.030e-07],
+    [400, 390, 20, 20, 34, 9.966e-08],
+    [400, 390, 20, 20, 35, 9.920e-08],
+    [440, 390, 5, 0, 34, 3.438e-08],
+    [440, 390, 5, 0, 35, 3.420e-08],
+    [440, 390, 5, 10, 34, 3.236e-08],
+    [440, 390, 5, 10, 35, 3.220e-08],
+    [440, 390, 5, 20, 34, 3.114e-08],
+    [440, 390, 5, 20, 35, 3.100e-08],
+    [440, 390, 10, 0, 34, 1.375e-07],
+    [440, 390, 10, 0, 35, 1.368e-07],
+    [440, 390, 10, 10, 34, 1.294e-07],
+    [440, 390, 10, 10, 35, 1.288e-07],
+    [440, 390, 10, 20, 34, 1.246e-07],
+    [440, 390, 10, 20, 35, 1.240e-07],
+    [440, 390, 20, 0, 34, 5.500e-07],
+    [440, 390, 20, 0, 35, 5.471e-07],
+    [440, 390, 20, 10, 34, 5.178e-07],
+    [440, 390, 20, 10, 35, 5.152e-07],
+    [440, 390, 20, 20, 34, 4.983e-07],
+    [440, 390, 20, 20, 35, 4.960e-07]
+], dtype=np.float64)
+_CO2FLUX_TEST_DATA.setflags(write=False)
+
+
 @attr('UNIT', group='func')
 class Testpco2FunctionsUnit(BaseUnitTestCase):
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         ###### Test data for PCO2W ######
         raw_strings = np.array([
             '*BC2705D5A7C0E10082005A0CA9090E07CB08E82DCA4B1C0082005A0CA9090E07CD08EC0C3208C38A',
@@ -38,41 +130,44 @@ class Testpco2FunctionsUnit(BaseUnitTestCase):
         ])
 
         # reagent constants (instrument and reagent bag specific)
-        self.calt = np.ones(14) * 4.6539
-        self.cala = np.ones(14) * 0.0422
-        self.calb = np.ones(14) * 0.6761
-        self.calc = np.ones(14) * -1.5798
+        cls.calt = np.full(14, 4.6539)
+        cls.cala = np.full(14, 0.0422)
+        cls.calb = np.full(14, 0.6761)
+        cls.calc = np.full(14, -1.5798)
 
         # expected outputs
-        self.therm = np.array([7.3151, 7.4258, 16.2306, 13.8108, 11.3900,
-                               9.8019, 8.6674, 8.3345, 8.2458, 8.2014,
-                               8.1792, 8.0905, 7.7359, 7.0716])
-        self.pco2 = np.array([fill_value, 609.8626, 394.3221, 351.6737, 321.4986,
-                              324.0670, 339.4317, 358.3335, 388.1735, 436.8431,
-                              481.1713, 566.8172, 607.5355, 685.8555])
-
-        # parse the data strings
-        self.mtype = np.zeros(14)
-        self.light = np.zeros((14, 14))
-        self.traw = np.zeros(14)
-        for i in range(14):
-            # parse the raw strings into subelements, such as the driver would
-            # provide.
-            s = raw_strings[i]
-            self.mtype[i] = int((s[5:7]), 16)
-            self.traw[i] = int((s[75:79]), 16)
-            strt = 15
-            step = 4
-            for j in range(14):
-                self.light[i, j] = int((s[strt:strt+step]), 16)
-                strt += step
-
-            if self.mtype[i] == 5:
-                a434blnk = self.light[i, 6]
-                a620blnk = self.light[i, 7]
-
-        self.a434blnk = np.ones(14) * a434blnk
-        self.a620blnk = np.ones(14) * a620blnk
+        cls.therm = np.array([7.3151, 7.4258, 16.2306, 13.8108, 11.3900,
+                              9.8019, 8.6674, 8.3345, 8.2458, 8.2014,
+                              8.1792, 8.0905, 7.7359, 7.0716], dtype=np.float64)
+        cls.pco2 = np.array([fill_value, 609.8626, 394.3221, 351.6737, 321.4986,
+                             324.0670, 339.4317, 358.3335, 388.1735, 436.8431,
+                             481.1713, 566.8172, 607.5355, 685.8555], dtype=np.float64)
+
+        # parse the raw strings into subelements, such as the driver would
+        # provide. the hex digits of all the strings are converted to their
+        # values in one pass through a character lookup table, and each field
+        # is then a dot product of its digits with the powers of 16.
+        hex_lut = np.zeros(256, dtype=np.int32)
+        hex_lut[ord('0'):ord('9')+1] = np.arange(10)
+        hex_lut[ord('A'):ord('F')+1] = np.arange(10, 16)
+        # the leading '*' record marker is stripped first, so the field offsets
+        # below count from the first hex character.
+        stripped = np.char.lstrip(raw_strings, '*')
+        chars = stripped.astype('S').view(np.uint8).reshape(stripped.size, -1)
+        digits = hex_lut[chars]
+        cls.mtype = digits[:, 4:6].dot(16 ** np.arange(1, -1, -1, dtype=np.int32))
+        cls.traw = digits[:, 74:78].dot(16 ** np.arange(3, -1, -1, dtype=np.int32))
+        cls.light = digits[:, 14:70].reshape(-1, 14, 4).dot(16 ** np.arange(3, -1, -1, dtype=np.int32))
+
+        # the blanks are taken from the last blank measurement (mtype == 5)
+        blank = cls.light[cls.mtype == 5][-1]
+        cls.a434blnk = np.full(14, blank[6])
+        cls.a620blnk = np.full(14, blank[7])
+
+        # none of the tests should modify the shared fixtures, make sure of it
+        for value in vars(cls).values():
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
 
     def test_pco2_pco2wat(self):
         """
@@ -105,20 +200,56 @@ class Testpco2FunctionsUnit(BaseUnitTestCase):
         np.testing.assert_allclose(pco2out, self.pco2, rtol=1e-4, atol=1e-4)
         np.testing.assert_allclose(tout, self.therm, rtol=1e-4, atol=1e-4)
 
+        ### bulk case, scalar calibration coefficients broadcast to records ###
+        pco2out = co2func.pco2_pco2wat(self.mtype, self.light, self.traw,
+                                       fill_value, fill_value, fill_value, fill_value,
+                                       self.calt[0], self.cala[0], self.calb[0], self.calc[0],
+                                       self.a434blnk[0], self.a620blnk[0])
+
+        np.testing.assert_allclose(pco2out, self.pco2, rtol=1e-4, atol=1e-4)
+
+        ### sample records with a single, scalar measurement type ###
+        # the blank flags from the scalar mtype are broadcast against the
+        # per-sample ratios and calibration coefficients
+        pco2out = co2func.pco2_pco2wat(4, self.light[1:, :], self.traw[1:],
+                                       fill_value, fill_value, fill_value, fill_value,
+                                       self.calt[1:], self.cala[1:], self.calb[1:], self.calc[1:],
+                                       self.a434blnk[1:], self.a620blnk[1:])
+
+        np.testing.assert_allclose(pco2out, self.pco2[1:], rtol=1e-4, atol=1e-4)
+
         ### single record case ###
-        indx = 0
-        for mtype in self.mtype:
-            tout = co2func.pco2_thermistor(self.traw[indx])
-            pco2out = co2func.pco2_pco2wat(mtype, self.light[indx, :], self.traw[indx],
+        # the bulk cases above check every record in one call, so only the
+        # first blank (mtype == 5) and sample records are run on their own to
+        # confirm single record inputs are handled.
+        for indx in (0, 1):
+            pco2out = co2func.pco2_pco2wat(self.mtype[indx], self.light[indx, :], self.traw[indx],
                                            fill_value, fill_value, fill_value, fill_value,
                                            self.calt[indx], self.cala[indx],
                                            self.calb[indx], self.calc[indx],
                                            self.a434blnk[indx], self.a620blnk[indx])
 
             np.testing.assert_allclose(pco2out, self.pco2[indx], rtol=1e-4, atol=1e-4)
-            np.testing.assert_allclose(tout, self.therm[indx], rtol=1e-4, atol=1e-4)
 
-            indx += 1
+    def test_pco2_thermistor(self):
+        """
+        Test pco2_thermistor function for the 12 and 14 bit SAMI variants.
+
+        A 14-bit instrument reports 4 times the counts of a 12-bit instrument
+        for the same thermistor resistance, so it should return the same
+        temperatures as the 12-bit test data.
+        """
+        tout = co2func.pco2_thermistor(self.traw, 12)
+        np.testing.assert_allclose(tout, self.therm, rtol=1e-4, atol=1e-4)
+
+        tout = co2func.pco2_thermistor(self.traw * 4, 14)
+        np.testing.assert_allclose(tout, self.therm, rtol=1e-4, atol=1e-4)
+
+        # mixed 12 and 14 bit records in a single call
+        sami_bits = np.tile([12, 14], 7)
+        traw = np.where(sami_bits == 14, self.traw * 4, self.traw)
+        tout = co2func.pco2_thermistor(traw, sami_bits)
+        np.testing.assert_allclose(tout, self.therm, rtol=1e-4, atol=1e-4)
 
     def test_pco2_ppressure(self):
         """
@@ -134,25 +265,9 @@ class Testpco2FunctionsUnit(BaseUnitTestCase):
 
         Implemented by Christopher Wingard, October 2014
         """
-        test_data = np.array([
-            [674, 1000, 665.19],
-            [619, 1000, 610.91],
-            [822, 1000, 811.25],
-            [973, 1000, 960.28],
-            [941, 1000, 928.69],
-            [863, 1000, 851.71],
-            [854, 1000, 842.83],
-            [833, 1000, 822.11],
-            [826, 1000, 815.20],
-            [814, 1000, 803.36],
-            [797, 1000, 786.58],
-            [782, 1000, 771.77],
-            [768, 1000, 757.96],
-            [754, 1000, 744.14],
-            [740, 1000, 730.32]
-        ])
+        test_data = _PPRESSURE_TEST_DATA
         ppres = co2func.pco2_ppressure(test_data[:, 0], test_data[:, 1])
-        np.testing.assert_allclose(ppres, test_data[:, 2], rtol=1e-2, atol=1e-2)
+        _fast_allclose(ppres.astype(np.float32, copy=False), test_data[:, 2], rtol=1e-2, atol=1e-2)
 
     def test_pco2_co2flux(self):
         """
@@ -168,62 +283,7 @@ class Testpco2FunctionsUnit(BaseUnitTestCase):
 
         Implemented by Christopher Wingard, April 2013
         """
-        test_data = np.array([
-            [360, 390, 5, 0, 34, -2.063e-08],
-            [360, 390, 5, 0, 35, -2.052e-08],
-            [360, 390, 5, 10, 34, -1.942e-08],
-            [360, 390, 5, 10, 35, -1.932e-08],
-            [360, 390, 5, 20, 34, -1.869e-08],
-            [360, 390, 5, 20, 35, -1.860e-08],
-            [360, 390, 10, 0, 34, -8.250e-08],
-            [360, 390, 10, 0, 35, -8.207e-08],
-            [360, 390, 10, 10, 34, -7.767e-08],
-            [360, 390, 10, 10, 35, -7.728e-08],
-            [360, 390, 10, 20, 34, -7.475e-08],
-            [360, 390, 10, 20, 35, -7.440e-08],
-            [360, 390, 20, 0, 34, -3.300e-07],
-            [360, 390, 20, 0, 35, -3.283e-07],
-            [360, 390, 20, 10, 34, -3.107e-07],
-            [360, 390, 20, 10, 35, -3.091e-07],
-            [360, 390, 20, 20, 34, -2.990e-07],
-            [360, 390, 20, 20, 35, -2.976e-07],
-            [400, 390, 5, 0, 34, 6.875e-09],
-            [400, 390, 5, 0, 35, 6.839e-09],
-            [400, 390, 5, 10, 34, 6.472e-09],
-            [400, 390, 5, 10, 35, 6.440e-09],
-            [400, 390, 5, 20, 34, 6.229e-09],
-            [400, 390, 5, 20, 35, 6.200e-09],
-            [400, 390, 10, 0, 34, 2.750e-08],
-            [400, 390, 10, 0, 35, 2.736e-08],
-            [400, 390, 10, 10, 34, 2.589e-08],
-            [400, 390, 10, 10, 35, 2.576e-08],
-            [400, 390, 10, 20, 34, 2.492e-08],
-            [400, 390, 10, 20, 35, 2.480e-08],
-            [400, 390, 20, 0, 34, 1.100e-07],
-            [400, 390, 20, 0, 35, 1.094e-07],
-            [400, 390, 20, 10, 34, 1.036e-07],
-            [400, 390, 20, 10, 35, 1.030e-07],
-            [400, 390, 20, 20, 34, 9.966e-08],
-            [400, 390, 20, 20, 35, 9.920e-08],
-            [440, 390, 5, 0, 34, 3.438e-08],
-            [440, 390, 5, 0, 35, 3.420e-08],
-            [440, 390, 5, 10, 34, 3.236e-08],
-            [440, 390, 5, 10, 35, 3.220e-08],
-            [440, 390, 5, 20, 34, 3.114e-08],
-            [440, 390, 5, 20, 35, 3.100e-08],
-            [440, 390, 10, 0, 34, 1.375e-07],
-            [440, 390, 10, 0, 35, 1.368e-07],
-            [440, 390, 10, 10, 34, 1.294e-07],
-            [440, 390, 10, 10, 35, 1.288e-07],
-            [440, 390, 10, 20, 34, 1.246e-07],
-            [440, 390, 10, 20, 35, 1.240e-07],
-            [440, 390, 20, 0, 34, 5.500e-07],
-            [440, 390, 20, 0, 35, 5.471e-07],
-            [440, 390, 20, 10, 34, 5.178e-07],
-            [440, 390, 20, 10, 35, 5.152e-07],
-            [440, 390, 20, 20, 34, 4.983e-07],
-            [440, 390, 20, 20, 35, 4.960e-07]
-        ])
+        test_data = _CO2FLUX_TEST_DATA
 
         # setup inputs and outputs
         pco2w = test_data[:, 0]
@@ -237,4 +297,4 @@ class Testpco2FunctionsUnit(BaseUnitTestCase):
         out = co2func.pco2_co2flux(pco2w, pco2a, u10, t, s)
 
         # and compare the results
-        self.assertTrue(np.allclose(out, flux, rtol=1e-9, atol=1e-9))
+        _fast_allclose(out, flux, rtol=1e-9, atol=1e-9)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+
+"""
+@package ion_functions.test.test_deprecated
+@file ion_functions/test/test_deprecated.py
+@brief Unit tests for the deprecated decorator
+"""
+
+from nose.plugins.attrib import attr
+from ion_functions.test.base_test import BaseUnitTestCase
+
+import warnings
+from ion_functions import deprecated
+
+
+@attr('UNIT', group='func')
+class TestDeprecatedUnit(BaseUnitTestCase):
+
+    def test_deprecated(self):
+        """
+        The wrapped function is called with the passed arguments and its
+        result returned, and a deprecation warning naming the function is
+        issued.
+        """
+        @deprecated
+        def add(a, b=1):
+            return a + b
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertEqual(add(1), 2)
+            self.assertEqual(add(1, b=3), 4)
+
+        self.assertEqual(len(caught), 2)
+        for w in caught:
+            self.assertTrue(issubclass(w.category, DeprecationWarning))
+            self.assertIn('add', str(w.message))
+        self.assertEqual(add.__name__, 'add')
+
+    def test_deprecated_after_ignored_call(self):
+        """
+        A call made while deprecation warnings are ignored (the Python 2.7
+        default) does not silence the warning for later calls once the
+        filters are turned on.
+        """
+        @deprecated
+        def add(a, b=1):
+            return a + b
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+            add(1)
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            add(1)
+
+        self.assertEqual(len(caught), 1)
+        self.assertTrue(issubclass(caught[0].category, DeprecationWarning))
+        self.assertIn('add', str(caught[0].message))
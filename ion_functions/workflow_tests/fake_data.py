@@ -5,20 +5,33 @@ scientific validations to support the accuracy of the algorithms.
 
 '''
 
+from pygsw import vectors as gsw
+
+# bind the gsw functions once, rather than looking them up on every call
+_sp_from_c = gsw.sp_from_c
+_sa_from_sp = gsw.sa_from_sp
+_rho = gsw.rho
+
+
+def data_l2_density_and_salinity(conductivity, temp, pressure, lat, lon):
+    '''
+    Returns both the density and the practical salinity, computing the
+    salinity only once.
+    '''
+    sp = _sp_from_c(conductivity, temp, pressure)
+    sa = _sa_from_sp(sp, pressure, lon, lat)
+    rho = _rho(sa, temp, pressure)
+    return rho, sp
+
 def data_l2_density(conductivity, temp,pressure, lat, lon):
     '''
     '''
-    from pygsw import vectors as gsw
-    # 
-    sp = gsw.sp_from_c(conductivity, temp, pressure)
-    sa = gsw.sa_from_sp(sp, pressure, lon, lat)
-    rho = gsw.rho(sa, temp, pressure)
+    rho, _ = data_l2_density_and_salinity(conductivity, temp, pressure, lat, lon)
     return rho
 
 def data_l2_salinity(conductivity, temp, pressure):
     '''
     '''
-    import pygsw.vectors as gsw
-    sal_value = gsw.sp_from_c(conductivity, temp, pressure)
+    sal_value = _sp_from_c(conductivity, temp, pressure)
     return sal_value
 